@@ -1,13 +1,35 @@
+from contextlib import asynccontextmanager
+
+import numpy as np
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional
-from model import TireDegradationModel, PitStopPrediction
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
+from model import TireDegradationModel
+
+SERVICE_VERSION = "2.1.0"
+
+# Batches smaller than this are fitted one stint at a time: TireDegradationModel.fit
+# is faster than fit_many for one or two stints, and it can hit the fit cache
+BATCH_FIT_MIN_STINTS = 3
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Run one dummy fit/predict cycle so the first real request does not pay
+    # the one-off cost of NumPy code paths being exercised for the first time
+    warmup_model = TireDegradationModel()
+    warmup_model.fit([1, 2, 3, 4, 5], [80.0, 80.1, 80.2, 80.3, 80.5])
+    warmup_model.predict_pit_window(current_stint_lap=5, max_stint_length=40)
+    yield
+
 
 app = FastAPI(
     title="F1 Pit Stop Prediction Service",
     description="ML service for predicting optimal pit stop windows based on tire degradation",
-    version="2.1.0"
+    version=SERVICE_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -21,6 +43,8 @@ app.add_middleware(
 
 
 class LapData(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     lap_number: int = Field(..., description="Overall lap number in the race")
     lap_duration: float = Field(..., description="Lap time in seconds")
     tire_compound: str = Field(..., description="Tire compound (SOFT, MEDIUM, HARD)")
@@ -28,6 +52,8 @@ class LapData(BaseModel):
 
 
 class PitStopRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     laps: list[LapData] = Field(..., description="List of lap data for analysis")
     degradation_threshold: float = Field(
         default=2.0, 
@@ -40,6 +66,8 @@ class PitStopRequest(BaseModel):
 
 
 class PitStopResponse(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     optimal_pit_lap: int = Field(..., description="Recommended lap to pit")
     confidence: float = Field(..., description="Prediction confidence (0-1)")
     degradation_rate: float = Field(..., description="Seconds lost per lap due to tire wear")
@@ -51,8 +79,22 @@ class PitStopResponse(BaseModel):
     recommendation: str = Field(..., description="Human-readable strategy recommendation")
 
 
+class BatchPitStopRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
+    requests: list[PitStopRequest] = Field(..., description="One pit stop request per driver stint")
+
+
+class BatchPitStopResponse(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
+    results: list[PitStopResponse] = Field(..., description="Predictions in request order")
+
+
 # Strategy Impact Models
 class DriverLapData(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     driver_number: int
     driver_name: str
     total_time: float  # Cumulative race time at pit lap
@@ -61,6 +103,8 @@ class DriverLapData(BaseModel):
 
 
 class StrategyImpactRequest(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     target_driver_number: int = Field(..., description="Driver number for pit stop analysis")
     pit_lap: int = Field(..., description="Suggested lap to pit")
     drivers_data: list[DriverLapData] = Field(..., description="All drivers' race data")
@@ -70,6 +114,8 @@ class StrategyImpactRequest(BaseModel):
 
 
 class NearbyDriver(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     driver_number: int
     driver_name: str
     gap: float  # Positive = behind, Negative = ahead
@@ -77,6 +123,8 @@ class NearbyDriver(BaseModel):
 
 
 class StrategyImpactResponse(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     current_position: int
     projected_position: int
     position_change: int  # Positive = gained positions, Negative = lost
@@ -91,9 +139,10 @@ class StrategyImpactResponse(BaseModel):
 async def root():
     return {
         "service": "F1 Pit Stop Prediction",
-        "version": "2.1.0",
+        "version": SERVICE_VERSION,
         "endpoints": {
             "POST /predict/pitstop": "Predict optimal pit stop window",
+            "POST /predict/pitstop/batch": "Predict pit stop windows for several stints in one call",
             "POST /predict/strategy-impact": "Calculate position impact of pit stop"
         },
         "features": [
@@ -111,13 +160,13 @@ async def health_check():
     return {"status": "healthy"}
 
 
-@app.post("/predict/pitstop", response_model=PitStopResponse)
-async def predict_pitstop(request: PitStopRequest):
+def _prepare_stint(request: PitStopRequest) -> tuple[np.ndarray, np.ndarray, int]:
     """
-    Predict the optimal pit stop window based on tire degradation analysis.
+    Validate a pit stop request and extract the laps to fit.
     
-    Uses polynomial regression to model tire degradation curves and
-    predicts when performance will degrade beyond acceptable threshold.
+    Returns:
+        (stint laps, lap durations, current stint lap) with obviously invalid
+        laps filtered out
     """
     if not request.laps:
         raise HTTPException(status_code=400, detail="No lap data provided")
@@ -131,23 +180,52 @@ async def predict_pitstop(request: PitStopRequest):
         )
     
     # Extract stint laps and durations
-    stint_laps = [lap.stint_lap for lap in request.laps]
-    lap_durations = [lap.lap_duration for lap in request.laps]
-    tire_compound = request.laps[0].tire_compound
+    n_laps = len(request.laps)
+    stint_laps = np.fromiter((lap.stint_lap for lap in request.laps), dtype=np.int64, count=n_laps)
+    lap_durations = np.fromiter((lap.lap_duration for lap in request.laps), dtype=np.float64, count=n_laps)
     
-    # Pre-filter obviously invalid laps
-    valid_laps = []
-    valid_durations = []
-    median_duration = sorted(lap_durations)[len(lap_durations) // 2]
+    # Pre-filter obviously invalid laps (selection instead of a full sort for the median)
+    median_duration = np.partition(lap_durations, n_laps // 2)[n_laps // 2]
+    valid_mask = lap_durations < median_duration * 1.2
     
-    for stint_lap, duration in zip(stint_laps, lap_durations):
-        if duration < median_duration * 1.2:
-            valid_laps.append(stint_lap)
-            valid_durations.append(duration)
+    if np.count_nonzero(valid_mask) >= min_laps:
+        return stint_laps[valid_mask], lap_durations[valid_mask], int(stint_laps.max())
+    return stint_laps, lap_durations, int(stint_laps.max())
+
+
+def _predict_response(
+    model: TireDegradationModel,
+    request: PitStopRequest,
+    current_stint_lap: int
+) -> PitStopResponse:
+    """Predict the pit window of a fitted model and build the API response."""
+    prediction = model.predict_pit_window(
+        current_stint_lap=current_stint_lap,
+        max_stint_length=request.max_stint_length
+    )
+    
+    return PitStopResponse(
+        optimal_pit_lap=prediction.optimal_pit_lap,
+        confidence=prediction.confidence,
+        degradation_rate=prediction.degradation_rate,
+        r2_score=prediction.r2_score,
+        laps_analyzed=prediction.laps_analyzed,
+        predicted_lap_times=prediction.predicted_lap_times,
+        tire_compound=request.laps[0].tire_compound,
+        is_degrading=prediction.is_degrading,
+        recommendation=prediction.recommendation
+    )
+
+
+@app.post("/predict/pitstop", response_model=PitStopResponse)
+def predict_pitstop(request: PitStopRequest):
+    """
+    Predict the optimal pit stop window based on tire degradation analysis.
     
-    if len(valid_laps) < min_laps:
-        valid_laps = stint_laps
-        valid_durations = lap_durations
+    Uses polynomial regression to model tire degradation curves and
+    predicts when performance will degrade beyond acceptable threshold.
+    """
+    valid_laps, valid_durations, current_stint_lap = _prepare_stint(request)
     
     try:
         model = TireDegradationModel(
@@ -155,24 +233,55 @@ async def predict_pitstop(request: PitStopRequest):
         )
         model.fit(valid_laps, valid_durations)
         
-        current_stint_lap = max(stint_laps)
+        return _predict_response(model, request, current_stint_lap)
         
-        prediction = model.predict_pit_window(
-            current_stint_lap=current_stint_lap,
-            max_stint_length=request.max_stint_length
-        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+
+@app.post("/predict/pitstop/batch", response_model=BatchPitStopResponse)
+def predict_pitstop_batch(request: BatchPitStopRequest):
+    """
+    Predict pit stop windows for several stints (e.g. the whole grid) in one call.
+    
+    Each entry is analyzed like POST /predict/pitstop. Batches of at least
+    BATCH_FIT_MIN_STINTS stints are fitted together with
+    TireDegradationModel.fit_many; smaller ones are fitted one by one. Errors
+    name the entry at fault by its index as "Stint {i}: ...".
+    """
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="No pit stop requests provided")
+    
+    prepared = []
+    for i, stint_request in enumerate(request.requests):
+        try:
+            prepared.append(_prepare_stint(stint_request))
+        except HTTPException as e:
+            raise HTTPException(status_code=e.status_code, detail=f"Stint {i}: {e.detail}")
+    
+    try:
+        if len(prepared) >= BATCH_FIT_MIN_STINTS:
+            models = TireDegradationModel.fit_many(
+                [valid_laps for valid_laps, _, _ in prepared],
+                [valid_durations for _, valid_durations, _ in prepared],
+                degradation_threshold=[r.degradation_threshold for r in request.requests]
+            )
+        else:
+            models = []
+            for i, (stint_request, (valid_laps, valid_durations, _)) in enumerate(zip(request.requests, prepared)):
+                model = TireDegradationModel(degradation_threshold=stint_request.degradation_threshold)
+                try:
+                    models.append(model.fit(valid_laps, valid_durations))
+                except ValueError as e:
+                    raise ValueError(f"Stint {i}: {e}") from e
         
-        return PitStopResponse(
-            optimal_pit_lap=prediction.optimal_pit_lap,
-            confidence=prediction.confidence,
-            degradation_rate=prediction.degradation_rate,
-            r2_score=prediction.r2_score,
-            laps_analyzed=prediction.laps_analyzed,
-            predicted_lap_times=prediction.predicted_lap_times,
-            tire_compound=tire_compound,
-            is_degrading=prediction.is_degrading,
-            recommendation=prediction.recommendation
-        )
+        return BatchPitStopResponse(results=[
+            _predict_response(model, stint_request, current_stint_lap)
+            for model, stint_request, (_, _, current_stint_lap)
+            in zip(models, request.requests, prepared)
+        ])
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -181,7 +290,7 @@ async def predict_pitstop(request: PitStopRequest):
 
 
 @app.post("/predict/strategy-impact", response_model=StrategyImpactResponse)
-async def predict_strategy_impact(request: StrategyImpactRequest):
+def predict_strategy_impact(request: StrategyImpactRequest):
     """
     Calculate the position impact of a pit stop strategy.
     
@@ -194,25 +303,31 @@ async def predict_strategy_impact(request: StrategyImpactRequest):
     if not request.drivers_data:
         raise HTTPException(status_code=400, detail="No driver data provided")
     
+    # Pull the grid into column arrays and index drivers by number in one pass
+    drivers = request.drivers_data
+    n_drivers = len(drivers)
+    numbers = np.empty(n_drivers, dtype=np.int64)
+    totals = np.empty(n_drivers, dtype=np.float64)
+    avg_laps = np.empty(n_drivers, dtype=np.float64)
+    index_by_number = {}
+    
+    for i, driver in enumerate(drivers):
+        numbers[i] = driver.driver_number
+        totals[i] = driver.total_time
+        avg_laps[i] = driver.avg_lap_time
+        index_by_number.setdefault(driver.driver_number, i)
+    
     # Find target driver
-    target_driver = None
-    for driver in request.drivers_data:
-        if driver.driver_number == request.target_driver_number:
-            target_driver = driver
-            break
+    target = index_by_number.get(request.target_driver_number)
     
-    if not target_driver:
+    if target is None:
         raise HTTPException(status_code=404, detail=f"Driver {request.target_driver_number} not found")
     
-    # Sort drivers by total time to get current positions
-    sorted_drivers = sorted(request.drivers_data, key=lambda d: d.total_time)
+    is_target = numbers == request.target_driver_number
     
-    # Find current position
-    current_position = 1
-    for i, driver in enumerate(sorted_drivers):
-        if driver.driver_number == request.target_driver_number:
-            current_position = i + 1
-            break
+    # Rank drivers by total time to get current positions
+    current_order = np.argsort(totals, kind="stable")
+    current_position = int(np.argmax(is_target[current_order])) + 1
     
     # Calculate time impact
     time_lost_in_pit = request.pit_stop_time
@@ -220,72 +335,43 @@ async def predict_strategy_impact(request: StrategyImpactRequest):
     net_time_impact = time_lost_in_pit - time_gained_fresh_tires
     
     # Calculate projected race time after pit
-    target_projected_time = target_driver.total_time + time_lost_in_pit
+    target_projected_time = totals[target] + time_lost_in_pit
     
     # For other drivers, project their time assuming they continue at avg pace
-    # and don't pit (simplified model)
-    projected_standings = []
-    for driver in request.drivers_data:
-        if driver.driver_number == request.target_driver_number:
-            projected_standings.append({
-                'driver_number': driver.driver_number,
-                'driver_name': driver.driver_name,
-                'projected_time': target_projected_time,
-                'is_target': True
-            })
-        else:
-            # Assume other drivers continue at their average pace
-            # Add one lap of racing time (the pit lap)
-            projected_time = driver.total_time + driver.avg_lap_time
-            projected_standings.append({
-                'driver_number': driver.driver_number,
-                'driver_name': driver.driver_name,
-                'projected_time': projected_time,
-                'is_target': False
-            })
-    
-    # Sort by projected time
-    projected_standings.sort(key=lambda x: x['projected_time'])
-    
-    # Find projected position
-    projected_position = 1
-    for i, driver in enumerate(projected_standings):
-        if driver['is_target']:
-            projected_position = i + 1
-            break
+    # and don't pit (simplified model): add one lap of racing time (the pit lap)
+    projected_times = totals + avg_laps
+    projected_times[is_target] = target_projected_time
+    
+    # Rank by projected time
+    projected_order = np.argsort(projected_times, kind="stable")
+    target_idx = int(np.argmax(is_target[projected_order]))
+    projected_position = target_idx + 1
     
     position_change = current_position - projected_position  # Positive = gained positions
     
     # Find nearby drivers after pit
-    ahead_of = []
-    behind_of = []
-    
-    target_idx = next(i for i, d in enumerate(projected_standings) if d['is_target'])
-    
     # Drivers we'd come out ahead of (up to 3)
-    for i in range(target_idx + 1, min(target_idx + 4, len(projected_standings))):
-        driver = projected_standings[i]
-        gap = driver['projected_time'] - target_projected_time
-        ahead_of.append(NearbyDriver(
-            driver_number=driver['driver_number'],
-            driver_name=driver['driver_name'],
-            gap=round(gap, 3),
+    ahead_of = [
+        NearbyDriver(
+            driver_number=int(numbers[j]),
+            driver_name=drivers[j].driver_name,
+            gap=round(float(projected_times[j] - target_projected_time), 3),
             position=i + 1
-        ))
-    
-    # Drivers we'd come out behind (up to 3)
-    for i in range(max(0, target_idx - 3), target_idx):
-        driver = projected_standings[i]
-        gap = target_projected_time - driver['projected_time']
-        behind_of.append(NearbyDriver(
-            driver_number=driver['driver_number'],
-            driver_name=driver['driver_name'],
-            gap=round(gap, 3),
-            position=i + 1
-        ))
+        )
+        for i, j in enumerate(projected_order[target_idx + 1:target_idx + 4], start=target_idx + 1)
+    ]
     
-    # Reverse behind_of so closest driver is first
-    behind_of.reverse()
+    # Drivers we'd come out behind (up to 3), closest driver first
+    behind_start = max(0, target_idx - 3)
+    behind_of = [
+        NearbyDriver(
+            driver_number=int(numbers[j]),
+            driver_name=drivers[j].driver_name,
+            gap=round(float(target_projected_time - projected_times[j]), 3),
+            position=i + 1
+        )
+        for i, j in reversed(list(enumerate(projected_order[behind_start:target_idx], start=behind_start)))
+    ]
     
     return StrategyImpactResponse(
         current_position=current_position,
@@ -300,5 +386,15 @@ async def predict_strategy_impact(request: StrategyImpactRequest):
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" selects uvloop and httptools when installed (see requirements.txt);
+    # an import string is required for multiple workers
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="auto",
+        http="auto"
+    )
@@ -1,11 +1,13 @@
+import bisect
+import functools
+import math
+import numbers
 import numpy as np
-from sklearn.preprocessing import PolynomialFeatures
-from sklearn.linear_model import LinearRegression
-from sklearn.pipeline import Pipeline
 from dataclasses import dataclass
+from typing import NamedTuple
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PitStopPrediction:
     optimal_pit_lap: int
     confidence: float
@@ -17,25 +19,45 @@ class PitStopPrediction:
     recommendation: str
 
 
+class _FittedState(NamedTuple):
+    """Everything fitting learns about a stint, independent of the pit threshold."""
+    a: float
+    b: float
+    c: float
+    base_lap_time: float
+    lap_time_std: float
+    r_squared: float
+    laps_analyzed: int
+    is_degrading: bool
+    degradation_rate: float
+
+
 class TireDegradationModel:
     """
     Model to analyze tire degradation and predict optimal pit stop windows.
-    Uses polynomial regression (degree 2) for better tire degradation curve fitting.
+    Uses polynomial regression (degree 2) for better tire degradation curve fitting,
+    solved directly with NumPy least squares.
     """
     
     MIN_LAPS_REQUIRED = 5
     
+    # Recommendation per degradation rate bucket (s/lap): the template at index i
+    # applies below _RECOMMENDATION_BOUNDS[i], the last one above all bounds
+    _RECOMMENDATION_BOUNDS = (0.02, 0.05, 0.08, 0.12)
+    _RECOMMENDATION_TEMPLATES = (
+        "Minimal tire degradation ({rate:.3f}s/lap) - tires in good condition. Can extend beyond lap {lap}.",
+        "Low tire degradation ({rate:.3f}s/lap) - tires wearing normally. Optimal pit window around lap {lap}.",
+        "Moderate tire degradation ({rate:.3f}s/lap) - consider pitting around lap {lap}.",
+        "High tire degradation ({rate:.3f}s/lap) - pit soon, ideally before lap {lap}.",
+        "Severe tire degradation ({rate:.3f}s/lap) - pit immediately if possible. Tires critically worn.",
+    )
+    
     def __init__(self, degradation_threshold: float = 2.0):
         """
         Args:
             degradation_threshold: Maximum acceptable lap time increase (seconds)
                                    before recommending a pit stop
         """
-        # Polynomial regression pipeline (degree 2)
-        self.model = Pipeline([
-            ('poly', PolynomialFeatures(degree=2, include_bias=False)),
-            ('linear', LinearRegression())
-        ])
         self.degradation_threshold = degradation_threshold
         self.is_fitted = False
         self.base_lap_time: float = 0.0
@@ -44,93 +66,333 @@ class TireDegradationModel:
         self.laps_analyzed: int = 0
         self.lap_time_std: float = 0.0
         self.is_degrading: bool = True
+        # Fitted polynomial coefficients: lap time = a*x^2 + b*x + c
+        self._a: float = 0.0
+        self._b: float = 0.0
+        self._c: float = 0.0
         
-    def _remove_outliers(self, stint_laps: np.ndarray, lap_durations: np.ndarray) -> tuple:
+    @classmethod
+    def _remove_outliers(cls, stint_laps: np.ndarray, lap_durations: np.ndarray) -> tuple:
         """
         Remove outliers using 2 standard deviations from mean.
         Removes pit in/out laps, safety car periods, and mistakes.
         """
-        mean_time = np.mean(lap_durations)
-        std_time = np.std(lap_durations)
+        # Mean and variance from the running sums Σy and Σy² (clamped against
+        # roundoff), so a stint with no spread returns before any temporaries
+        n = len(lap_durations)
+        mean_time = lap_durations.sum() / n
+        variance = max(np.dot(lap_durations, lap_durations) / n - mean_time * mean_time, 0.0)
         
-        if std_time == 0:
+        if variance == 0:
             return stint_laps, lap_durations
         
-        # Keep laps within 2 standard deviations
-        mask = np.abs(lap_durations - mean_time) < 2 * std_time
+        # Keep laps within 2 standard deviations: |d| < 2*std  <=>  d^2 < 4*var
+        centered = lap_durations - mean_time
+        sq_deviations = centered * centered
+        mask = sq_deviations < 4 * variance
         
         # Ensure we keep at least MIN_LAPS_REQUIRED laps
-        if np.sum(mask) < self.MIN_LAPS_REQUIRED:
+        if np.count_nonzero(mask) < cls.MIN_LAPS_REQUIRED:
             # If too few laps after outlier removal, keep the closest ones to the mean
-            deviations = np.abs(lap_durations - mean_time)
-            sorted_indices = np.argsort(deviations)
+            k = cls.MIN_LAPS_REQUIRED
+            closest_indices = np.argpartition(sq_deviations, k - 1)[:k]
             mask = np.zeros(len(lap_durations), dtype=bool)
-            mask[sorted_indices[:self.MIN_LAPS_REQUIRED]] = True
+            mask[closest_indices] = True
         
         return stint_laps[mask], lap_durations[mask]
         
-    def fit(self, stint_laps: list[int], lap_durations: list[float]) -> "TireDegradationModel":
+    def fit(self, stint_laps: list[int] | np.ndarray, lap_durations: list[float] | np.ndarray) -> "TireDegradationModel":
         """
         Learn the degradation pattern from lap times.
         
         Args:
-            stint_laps: List of lap numbers within the stint (1, 2, 3, ...)
-            lap_durations: List of corresponding lap durations in seconds
+            stint_laps: Lap numbers within the stint (1, 2, 3, ...), as a list or array
+            lap_durations: Corresponding lap durations in seconds, as a list or array
             
         Returns:
             self for method chaining
         """
-        if len(stint_laps) < self.MIN_LAPS_REQUIRED or len(lap_durations) < self.MIN_LAPS_REQUIRED:
-            raise ValueError(f"Need at least {self.MIN_LAPS_REQUIRED} laps for reliable prediction")
+        x, y = self._validated_arrays(stint_laps, lap_durations)
+        
+        # The same stint is often re-queried with a different current lap or
+        # stint length, so the fitted state is memoized on the input laps
+        self._set_fitted_state(_fit_cached(tuple(x.tolist()), tuple(y.tolist())))
+        return self
+    
+    @classmethod
+    def fit_many(
+        cls,
+        stints_laps: list[list[int] | np.ndarray],
+        stints_durations: list[list[float] | np.ndarray],
+        degradation_threshold: float | list[float] = 2.0
+    ) -> list["TireDegradationModel"]:
+        """
+        Learn the degradation pattern of several stints (e.g. every driver) at once.
+        
+        Args:
+            stints_laps: Lap numbers within each stint
+            stints_durations: Corresponding lap durations in seconds for each stint
+            degradation_threshold: One threshold for all stints, or one per stint
             
-        if len(stint_laps) != len(lap_durations):
-            raise ValueError("stint_laps and lap_durations must have same length")
+        Returns:
+            One fitted model per stint, in input order
+            
+        Raises:
+            ValueError: If a stint cannot be fitted; the message starts with
+                        "Stint {index}: " to identify it
+        """
+        if len(stints_laps) != len(stints_durations):
+            raise ValueError("stints_laps and stints_durations must have same length")
         
-        X = np.array(stint_laps).reshape(-1, 1)
-        y = np.array(lap_durations)
+        if isinstance(degradation_threshold, numbers.Real):
+            thresholds = [degradation_threshold] * len(stints_laps)
+        elif len(degradation_threshold) != len(stints_laps):
+            raise ValueError("Need one degradation_threshold per stint")
+        else:
+            thresholds = degradation_threshold
+        
+        stints = []
+        for i, (laps, durations) in enumerate(zip(stints_laps, stints_durations)):
+            try:
+                stints.append(cls._validated_arrays(laps, durations))
+            except ValueError as e:
+                raise ValueError(f"Stint {i}: {e}") from e
+        
+        models = []
+        for threshold, fitted_state in zip(thresholds, cls._fit_states(stints)):
+            model = cls(degradation_threshold=threshold)
+            model._set_fitted_state(fitted_state)
+            models.append(model)
+        return models
+    
+    @classmethod
+    def _validated_arrays(cls, stint_laps, lap_durations) -> tuple[np.ndarray, np.ndarray]:
+        """Check a stint's lap counts and values and return it as float64 arrays."""
+        if len(stint_laps) < cls.MIN_LAPS_REQUIRED or len(lap_durations) < cls.MIN_LAPS_REQUIRED:
+            raise ValueError(f"Need at least {cls.MIN_LAPS_REQUIRED} laps for reliable prediction")
         
-        # Remove outliers
-        X_clean, y_clean = self._remove_outliers(X.flatten(), y)
-        X_clean = X_clean.reshape(-1, 1)
+        if len(stint_laps) != len(lap_durations):
+            raise ValueError("stint_laps and lap_durations must have same length")
         
-        self.laps_analyzed = len(X_clean)
+        x = np.asarray(stint_laps, dtype=np.float64)
+        y = np.asarray(lap_durations, dtype=np.float64)
         
-        if self.laps_analyzed < self.MIN_LAPS_REQUIRED:
-            raise ValueError(f"Only {self.laps_analyzed} clean laps after outlier removal. Need at least {self.MIN_LAPS_REQUIRED}.")
+        # NaN or infinite values would propagate into every fitted statistic
+        if not (np.isfinite(x).all() and np.isfinite(y).all()):
+            raise ValueError("stint_laps and lap_durations must contain only finite values")
         
-        # Fit polynomial regression
-        self.model.fit(X_clean, y_clean)
+        return x, y
+    
+    def _set_fitted_state(self, fitted_state: _FittedState) -> None:
+        """Populate the fitted attributes from a fitted state."""
+        self._a = fitted_state.a
+        self._b = fitted_state.b
+        self._c = fitted_state.c
+        self.base_lap_time = fitted_state.base_lap_time
+        self.lap_time_std = fitted_state.lap_time_std
+        self.r_squared = fitted_state.r_squared
+        self.laps_analyzed = fitted_state.laps_analyzed
+        self.is_degrading = fitted_state.is_degrading
+        self.degradation_rate = fitted_state.degradation_rate
+        self.is_fitted = True
+    
+    @classmethod
+    def _fit_state(cls, x: np.ndarray, y: np.ndarray) -> _FittedState:
+        """
+        Fit the degradation curve and statistics on validated float64 arrays.
         
-        # Store cleaned lap time statistics
-        self.lap_time_std = np.std(y_clean)
-        self.base_lap_time = np.min(y_clean)  # Fastest clean lap as baseline
+        Args:
+            x: Stint lap numbers
+            y: Corresponding lap durations in seconds
+        """
+        # Remove outliers
+        x_clean, y_clean = cls._remove_outliers(x, y)
+        
+        n = len(x_clean)
+        
+        if n < cls.MIN_LAPS_REQUIRED:
+            raise ValueError(f"Only {n} clean laps after outlier removal. Need at least {cls.MIN_LAPS_REQUIRED}.")
+        
+        # Lap times are taken relative to the first lap before centering, so a
+        # stint of identical laps has exactly zero spread however it is summed
+        x_mean = x_clean.mean()
+        y_relative = y_clean - y_clean[0]
+        y_relative_mean = y_relative.mean()
+        dx = x_clean - x_mean
+        dy = y_relative - y_relative_mean
+        dx2 = dx * dx
+        y_mean = y_clean[0] + y_relative_mean
+        
+        state = cls._state_from_sums(
+            n=n, x_mean=x_mean, y_mean=y_mean,
+            s2=dx2.sum(), s3=np.dot(dx2, dx), s4=np.dot(dx2, dx2),
+            r0=dy.sum(), r1=np.dot(dx, dy), r2=np.dot(dx2, dy),
+            ss_tot=np.dot(dy, dy), first_half_sum=dy[:n // 2].sum(),
+            base_lap_time=y_clean.min()
+        )
+        return _FittedState._make(np.asarray(value).item() for value in state)
+    
+    @classmethod
+    def _fit_states(cls, stints: list[tuple[np.ndarray, np.ndarray]]) -> list[_FittedState]:
+        """
+        Fit the degradation curve and statistics of several stints at once.
         
-        # Calculate degradation rate as average slope (linear approximation)
-        # For polynomial: y = a*x^2 + b*x + c, degradation rate ≈ b (linear component)
-        linear_model = LinearRegression()
-        linear_model.fit(X_clean, y_clean)
-        self.degradation_rate = linear_model.coef_[0]
+        Batched counterpart of _fit_state used by fit_many: outliers are removed
+        per stint; all remaining laps are then concatenated and every per-stint
+        sum comes from one segmented reduction, so the cost of the NumPy calls
+        is shared by the whole batch. A single stint is faster through _fit_state.
         
-        # Determine if tires are actually degrading
-        first_half_avg = np.mean(y_clean[:len(y_clean)//2]) if len(y_clean) > 1 else y_clean[0]
-        second_half_avg = np.mean(y_clean[len(y_clean)//2:]) if len(y_clean) > 1 else y_clean[0]
-        self.is_degrading = second_half_avg > first_half_avg
+        Args:
+            stints: Validated (stint laps, lap durations) float64 array pairs
+            
+        Returns:
+            Fitted state of each stint, in input order
+        """
+        if not stints:
+            return []
+        
+        cleaned = [cls._remove_outliers(x, y) for x, y in stints]
+        
+        counts = np.array([len(x_clean) for x_clean, _ in cleaned])
+        too_few = counts < cls.MIN_LAPS_REQUIRED
+        if too_few.any():
+            failed = int(np.argmax(too_few))
+            raise ValueError(f"Stint {failed}: Only {counts[failed]} clean laps after outlier removal. Need at least {cls.MIN_LAPS_REQUIRED}.")
+        
+        x = np.concatenate([x_clean for x_clean, _ in cleaned])
+        y = np.concatenate([y_clean for _, y_clean in cleaned])
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        
+        def segment_sum(values: np.ndarray) -> np.ndarray:
+            return np.add.reduceat(values, starts)
+        
+        # Lap times relative to each stint's first lap, as in _fit_state
+        x_mean = segment_sum(x) / counts
+        y_relative = y - np.repeat(y[starts], counts)
+        y_relative_mean = segment_sum(y_relative) / counts
+        dx = x - np.repeat(x_mean, counts)
+        dy = y_relative - np.repeat(y_relative_mean, counts)
+        dx2 = dx * dx
+        y_mean = y[starts] + y_relative_mean
+        
+        # Reducing at both the start and the midpoint of every stint yields
+        # the first half sums at the even positions
+        half_sums = np.add.reduceat(dy, np.column_stack((starts, starts + counts // 2)).ravel())
+        
+        state = cls._state_from_sums(
+            n=counts, x_mean=x_mean, y_mean=y_mean,
+            s2=segment_sum(dx2), s3=segment_sum(dx2 * dx), s4=segment_sum(dx2 * dx2),
+            r0=segment_sum(dy), r1=segment_sum(dx * dy), r2=segment_sum(dx2 * dy),
+            ss_tot=segment_sum(dy * dy), first_half_sum=half_sums[0::2],
+            base_lap_time=np.minimum.reduceat(y, starts)
+        )
+        columns = [np.asarray(values).tolist() for values in state]
+        return [_FittedState._make(fields) for fields in zip(*columns)]
+    
+    @staticmethod
+    def _state_from_sums(n, x_mean, y_mean, s2, s3, s4, r0, r1, r2, ss_tot, first_half_sum, base_lap_time) -> _FittedState:
+        """
+        Fit polynomial regression (degree 2) from the sums over a stint's clean
+        laps, centered as dx = x - x_mean and dy = y - y_mean.
         
-        # Calculate R-squared for model fit quality
-        y_pred = self.model.predict(X_clean)
-        ss_res = np.sum((y_clean - y_pred) ** 2)
-        ss_tot = np.sum((y_clean - np.mean(y_clean)) ** 2)
-        self.r_squared = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
-        self.r_squared = max(0.0, min(1.0, self.r_squared))  # Clamp to [0, 1]
+        The curve solves the normal equations on centered data
+        (dy ≈ c + b*dx + a*dx^2); centering keeps them well conditioned for
+        stints of any length. Every formula is elementwise, so the arguments
+        may be NumPy scalars for one stint or equal-length arrays for a batch,
+        and the returned fields have the same shape.
         
-        self.is_fitted = True
-        return self
+        Args:
+            n: Clean lap count
+            x_mean, y_mean: Mean stint lap number and mean lap duration
+            s2, s3, s4: Σdx², Σdx³, Σdx⁴ (Σdx is zero after centering)
+            r0, r1, r2: Σdy, Σdx·dy, Σdx²·dy
+            ss_tot: Σdy²
+            first_half_sum: Σdy over the first n // 2 laps
+            base_lap_time: Fastest clean lap, used as the baseline
+        """
+        # Guards are boolean masks multiplied in (and added to denominators to
+        # keep them nonzero), so no formula branches on a particular stint
+        
+        # Average degradation rate is the least-squares line slope,
+        # cov(x, y) / var(x), read straight off the same sums
+        has_spread = s2 > 0
+        safe_s2 = s2 + ~has_spread
+        slope = r1 / safe_s2 * has_spread
+        
+        # Eliminating c and b leaves curvature_info * a = curvature_rhs. With
+        # fewer than three distinct lap numbers dx^2 is an affine function of
+        # dx and the curvature is undetermined: fall back to a straight line.
+        curvature_info = (s4 - s2 * s2 / n - s3 * s3 / safe_s2) * has_spread
+        solvable = curvature_info > 1e-9 * s4
+        curvature_rhs = r2 - s2 * r0 / n - s3 * slope
+        a = curvature_rhs / (curvature_info + ~solvable) * solvable
+        b = slope - s3 * a / safe_s2
+        c = (r0 - s2 * a) / n * solvable
+        
+        # Residual sum of squares of a least-squares fit follows from the same
+        # sums (y'y - beta'X'y), so R² needs no prediction pass over the laps
+        ss_res = np.maximum(ss_tot - (c * r0 + b * r1 + a * r2), 0.0)
+        
+        # Calculate R-squared for model fit quality, clamped to [0, 1]
+        has_variance = ss_tot > 0
+        r_squared = np.minimum(np.maximum(1 - ss_res / (ss_tot + ~has_variance), 0.0), 1.0) * has_variance
+        
+        # Determine if tires are actually degrading (second half slower than first);
+        # the second half sum is the total minus the first half
+        half = n // 2
+        is_degrading = (r0 - first_half_sum) / (n - half) > first_half_sum / half
+        
+        return _FittedState(
+            # Expand back to coefficients in x
+            a=a,
+            b=b - 2 * a * x_mean,
+            c=c + y_mean - b * x_mean + a * x_mean * x_mean,
+            base_lap_time=base_lap_time,
+            lap_time_std=np.sqrt(ss_tot / n),
+            r_squared=r_squared,
+            laps_analyzed=n,
+            is_degrading=is_degrading,
+            degradation_rate=slope  # Average slope (linear approximation)
+        )
     
     def predict_lap_time(self, stint_lap: int) -> float:
         """Predict lap time for a given stint lap number."""
         if not self.is_fitted:
             raise RuntimeError("Model must be fitted before prediction")
-        return float(self.model.predict([[stint_lap]])[0])
+        return self._a * stint_lap * stint_lap + self._b * stint_lap + self._c
+    
+    def _first_lap_above(self, threshold_time: float, first_lap: int, last_lap: int) -> int | None:
+        """
+        Find the first lap in [first_lap, last_lap] whose predicted time exceeds
+        threshold_time, or None if there is none.
+        
+        Solves a*L^2 + b*L + (c - threshold_time) = 0 analytically instead of
+        evaluating every lap: the answer is either first_lap or the first whole
+        lap after a root. Candidates around each root are checked directly, so
+        floating point error in the roots cannot shift the result.
+        """
+        a, b, c = self._a, self._b, self._c - threshold_time
+        
+        roots = []
+        if a != 0.0:
+            disc = b * b - 4 * a * c
+            if disc >= 0:
+                # Numerically stable quadratic formula
+                q = -0.5 * (b + math.copysign(math.sqrt(disc), b))
+                roots = [q / a, c / q] if q != 0.0 else [0.0]
+        elif b != 0.0:
+            roots = [-c / b]
+        
+        candidates = {first_lap, first_lap + 1}
+        for root in roots:
+            if first_lap - 1 <= root <= last_lap:
+                lap = math.floor(root)
+                candidates.update((lap, lap + 1, lap + 2))
+        
+        for lap in sorted(candidates):
+            if first_lap <= lap <= last_lap and a * lap * lap + b * lap + c > 0:
+                return lap
+        return None
     
     def predict_pit_window(
         self, 
@@ -150,22 +412,17 @@ class TireDegradationModel:
         if not self.is_fitted:
             raise RuntimeError("Model must be fitted before prediction")
         
-        # Calculate predicted lap times for future laps
-        future_laps = list(range(current_stint_lap, max_stint_length + 1))
-        predicted_times = [self.predict_lap_time(lap) for lap in future_laps]
-        
         # Find optimal pit lap based on degradation threshold
         optimal_pit_lap = max_stint_length  # Default to max if no threshold crossed
-        
+
         if self.is_degrading and self.degradation_rate > 0:
             # Positive degradation (times getting slower)
-            # Find when lap time exceeds base + threshold
+            # Find first lap where lap time exceeds base + threshold
             threshold_time = self.base_lap_time + self.degradation_threshold
-            
-            for lap, predicted_time in zip(future_laps, predicted_times):
-                if predicted_time > threshold_time:
-                    optimal_pit_lap = lap
-                    break
+
+            crossing_lap = self._first_lap_above(threshold_time, current_stint_lap, max_stint_length)
+            if crossing_lap is not None:
+                optimal_pit_lap = crossing_lap
         else:
             # Negative or zero degradation (tires improving or stable)
             # Push stint to maximum
@@ -174,6 +431,10 @@ class TireDegradationModel:
         # Ensure optimal pit lap is at least current lap + 1
         optimal_pit_lap = max(optimal_pit_lap, current_stint_lap + 1)
         
+        # Predicted lap times are only needed for display (next 10 laps)
+        display_laps = np.arange(current_stint_lap, min(current_stint_lap + 10, max_stint_length + 1), dtype=np.float64)
+        predicted_times = self._c + display_laps * (self._b + self._a * display_laps)
+        
         # Calculate confidence
         confidence = self._calculate_confidence()
         
@@ -186,7 +447,7 @@ class TireDegradationModel:
             degradation_rate=round(self.degradation_rate, 4),
             r2_score=round(self.r_squared, 3),
             laps_analyzed=self.laps_analyzed,
-            predicted_lap_times=[round(t, 3) for t in predicted_times[:10]],
+            predicted_lap_times=np.round(predicted_times, 3).tolist(),
             is_degrading=self.is_degrading,
             recommendation=recommendation
         )
@@ -203,8 +464,8 @@ class TireDegradationModel:
         if not self.is_fitted:
             return 0.0
         
-        # Component 1: R² score (40%)
-        r2_component = max(0.0, self.r_squared) * 0.4
+        # Component 1: R² score (40%) - already clamped to [0, 1] by fit()
+        r2_component = self.r_squared * 0.4
         
         # Component 2: Number of laps (30%) - max confidence at 15+ laps
         laps_component = min(self.laps_analyzed / 15.0, 1.0) * 0.3
@@ -218,13 +479,13 @@ class TireDegradationModel:
             normalized_std = 1.0
         consistency_component = (1.0 - normalized_std) * 0.3
         
-        confidence = r2_component + laps_component + consistency_component
-        
-        # Penalty for unreasonable degradation rates
-        if abs(self.degradation_rate) > 0.3:  # More than 0.3s/lap is unusual
-            confidence *= 0.7
-        
-        return max(0.0, min(1.0, confidence))
+        # Penalty (x0.7) for unreasonable degradation rates - more than 0.3s/lap is unusual
+        penalty = 1.0 - 0.3 * (abs(self.degradation_rate) > 0.3)
+        # Every component is bounded to [0, weight] and the weights sum to 1,
+        # so the result is already within [0, 1] and needs no final clamp.
+        # This relies on finite fitted statistics, which fit() guarantees by
+        # rejecting non-finite lap data in _validated_arrays
+        return (r2_component + laps_component + consistency_component) * penalty
     
     def _generate_recommendation(self, optimal_pit_lap: int) -> str:
         """
@@ -238,13 +499,16 @@ class TireDegradationModel:
         
         deg_rate = abs(self.degradation_rate)
         
-        if deg_rate < 0.02:
-            return f"Minimal tire degradation ({deg_rate:.3f}s/lap) - tires in good condition. Can extend beyond lap {optimal_pit_lap}."
-        elif deg_rate < 0.05:
-            return f"Low tire degradation ({deg_rate:.3f}s/lap) - tires wearing normally. Optimal pit window around lap {optimal_pit_lap}."
-        elif deg_rate < 0.08:
-            return f"Moderate tire degradation ({deg_rate:.3f}s/lap) - consider pitting around lap {optimal_pit_lap}."
-        elif deg_rate < 0.12:
-            return f"High tire degradation ({deg_rate:.3f}s/lap) - pit soon, ideally before lap {optimal_pit_lap}."
-        else:
-            return f"Severe tire degradation ({deg_rate:.3f}s/lap) - pit immediately if possible. Tires critically worn."
+        template = self._RECOMMENDATION_TEMPLATES[bisect.bisect_right(self._RECOMMENDATION_BOUNDS, deg_rate)]
+        return template.format(rate=deg_rate, lap=optimal_pit_lap)
+
+
+@functools.lru_cache(maxsize=256)
+def _fit_cached(stint_laps: tuple[float, ...], lap_durations: tuple[float, ...]) -> _FittedState:
+    """
+    Fit a stint and return its fitted state.
+    
+    The fit does not depend on degradation_threshold, so one cache entry serves
+    every threshold, current lap and stint length for the same laps.
+    """
+    return TireDegradationModel._fit_state(np.array(stint_laps), np.array(lap_durations))